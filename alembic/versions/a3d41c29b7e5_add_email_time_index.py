@@ -0,0 +1,28 @@
+"""Add email_time index
+
+Revision ID: a3d41c29b7e5
+Revises: fc87c0cb59ce
+Create Date: 2024-11-18 10:12:44.031287
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3d41c29b7e5'
+down_revision: Union[str, None] = 'fc87c0cb59ce'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # fetch_articles_from_days filters on email_time >= cutoff; without an
+    # index this is a sequential scan over the whole articles table
+    op.create_index(op.f('ix_articles_email_time'), 'articles', ['email_time'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_articles_email_time'), table_name='articles')
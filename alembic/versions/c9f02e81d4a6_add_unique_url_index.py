@@ -0,0 +1,32 @@
+"""Add unique url index
+
+Revision ID: c9f02e81d4a6
+Revises: a3d41c29b7e5
+Create Date: 2024-11-19 09:05:17.482913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c9f02e81d4a6'
+down_revision: Union[str, None] = 'a3d41c29b7e5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Drop duplicate URLs (keeping the oldest row) so the unique index can
+    # build; save_article only guarded against duplicates best-effort
+    op.execute(
+        "DELETE FROM articles a USING articles b "
+        "WHERE a.url = b.url AND a.id > b.id"
+    )
+    op.create_index(op.f('ix_articles_url'), 'articles', ['url'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_articles_url'), table_name='articles')
@@ -7,34 +7,50 @@ It also includes validation for the allowed senders list.
 import yaml
 import re
 import logging
+from functools import lru_cache
 
 logger = logging.getLogger(__name__)
 
+# Prefer the libyaml C loader when available; it parses noticeably faster
+# than the pure-Python SafeLoader.
+_YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+@lru_cache(maxsize=1)
 def load_config():
-    # Load the YAML configuration file
+    # Load the YAML configuration file (parsed once per process and cached;
+    # call load_config.cache_clear() to force a reload)
     with open('config.yaml', 'r') as file:
-        return yaml.safe_load(file)
+        return yaml.load(file, Loader=_YAML_LOADER)
+
+# Precompiled at import so validation doesn't hit the re module cache per call
+_EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+_DOMAIN_RE = re.compile(r'^[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
 
 def validate_email(email):
     # Validate if a string is a valid email address
-    return re.match(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$', email) is not None
+    return _EMAIL_RE.match(email) is not None
 
 def validate_domain(domain):
     # Validate if a string is a valid domain
-    return re.match(r'^[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$', domain) is not None
+    return _DOMAIN_RE.match(domain) is not None
 
+@lru_cache(maxsize=None)
 def get_allowed_senders():
     # Retrieve and validate the list of allowed senders and domains from the config
     config = load_config()
     allowed_senders = config['email_settings']['allowed_senders']
     allowed_domains = config['email_settings'].get('allowed_domains', [])
     
-    valid_senders = [sender for sender in allowed_senders if validate_email(sender)]
-    valid_domains = [domain for domain in allowed_domains if validate_domain(domain)]
-    
-    invalid_senders = set(allowed_senders) - set(valid_senders)
-    invalid_domains = set(allowed_domains) - set(valid_domains)
-    
+    # Partition into valid/invalid in a single pass instead of re-deriving
+    # the invalid entries via set differences
+    valid_senders, invalid_senders = [], []
+    for sender in allowed_senders:
+        (valid_senders if validate_email(sender) else invalid_senders).append(sender)
+
+    valid_domains, invalid_domains = [], []
+    for domain in allowed_domains:
+        (valid_domains if validate_domain(domain) else invalid_domains).append(domain)
+
     if invalid_senders:
         logger.warning(f"Invalid senders in config: {', '.join(invalid_senders)}")
     if invalid_domains:
@@ -42,22 +58,35 @@ def get_allowed_senders():
     
     return valid_senders + [f"*@{domain}" for domain in valid_domains]
 
+@lru_cache(maxsize=None)
 def get_min_relevancy_score():
     # Retrieve the minimum relevance score for articles
     config = load_config()
     return config['search_settings']['min_relevance_score']
 
+@lru_cache(maxsize=None)
 def get_max_results():
     # Retrieve the maximum number of results to display
     config = load_config()
     return config['output_settings']['max_results']
 
+@lru_cache(maxsize=None)
 def get_search_criteria():
     # Retrieve the list of search criteria from the config
     config = load_config()
     return config['search_settings']['criteria']
 
+@lru_cache(maxsize=None)
 def get_cron_frequency():
     # Retrieve the frequency for the cron job in minutes
     config = load_config()
     return config['cron_settings']['frequency']
+
+def reload_config():
+    # Clear every cached config value so the next access re-reads config.yaml
+    load_config.cache_clear()
+    get_allowed_senders.cache_clear()
+    get_min_relevancy_score.cache_clear()
+    get_max_results.cache_clear()
+    get_search_criteria.cache_clear()
+    get_cron_frequency.cache_clear()
@@ -4,6 +4,7 @@ from sqlalchemy.orm import sessionmaker
 import os
 from dotenv import load_dotenv
 from sqlalchemy.exc import IntegrityError
+import orjson
 
 load_dotenv()
 
@@ -19,10 +20,10 @@ class Article(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     email_uid = Column(String, nullable=False)
-    email_time = Column(DateTime, nullable=False)
+    email_time = Column(DateTime, nullable=False, index=True)
     title = Column(String, nullable=False)
     description = Column(Text, nullable=False)
-    url = Column(String, nullable=False)
+    url = Column(String, nullable=False, unique=True, index=True)
     criteria = Column(Text, nullable=False)
 
 def get_db():
@@ -40,7 +41,8 @@ def save_article(db, email_uid, email_time, title, description, url, criteria):
 
     # If no existing article, proceed with saving
     db_article = Article(email_uid=email_uid, email_time=email_time, title=title, 
-                         description=description, url=url, criteria=str(criteria))
+                         description=description, url=url,
+                         criteria=orjson.dumps(criteria).decode())
     db.add(db_article)
     try:
         db.commit()
@@ -51,6 +53,53 @@ def save_article(db, email_uid, email_time, title, description, url, criteria):
         # In case of a race condition, fetch the article again
         return db.query(Article).filter(Article.url == url).first()
 
+def has_articles(db, date_from=None):
+    # Cheap EXISTS-style probe; lets callers skip materializing (and parsing)
+    # a full result set just to find out the window is empty
+    query = db.query(Article.id).filter(Article.url.notlike('%https://github.com%'))
+    if date_from:
+        query = query.filter(Article.email_time >= date_from)
+    return query.limit(1).first() is not None
+
+# Process-lifetime cache of URLs known to be stored already. Newsletters
+# re-link the same articles across issues, so this skips both the existence
+# SELECT and the insert attempt for anything this process has seen before.
+# A miss is always re-checked against the database, so staleness is safe.
+_seen_urls = set()
+
+def save_articles(db, rows):
+    # Save a batch of articles with a single INSERT and one commit, skipping
+    # URLs that already exist in the database or earlier in the batch
+    rows = [row for row in rows if row['url'] not in _seen_urls]
+    if not rows:
+        return
+
+    urls = {row['url'] for row in rows}
+    existing_urls = {url for (url,) in db.query(Article.url).filter(Article.url.in_(urls))}
+    _seen_urls.update(existing_urls)
+
+    new_rows = []
+    for row in rows:
+        if row['url'] in existing_urls:
+            continue
+        existing_urls.add(row['url'])
+        # Plain dicts feed bulk_insert_mappings below without constructing
+        # (and change-tracking) an ORM instance per row
+        new_rows.append({**row, 'criteria': orjson.dumps(row['criteria']).decode()})
+    if not new_rows:
+        return
+
+    db.bulk_insert_mappings(Article, new_rows)
+    try:
+        db.commit()
+        _seen_urls.update(row['url'] for row in new_rows)
+    except IntegrityError:
+        db.rollback()
+        # A concurrent writer inserted one of the URLs mid-batch; fall back
+        # to the per-row path, which re-checks each URL
+        for row in rows:
+            save_article(db, **row)
+
 def get_articles(db, date_from=None, limit=None):
     query = db.query(Article).filter(Article.url.notlike('%https://github.com%'))
     if date_from:
@@ -1,29 +1,31 @@
-import subprocess
 import sys
+from alembic import command
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from database import engine
 
 def run_migrations():
     try:
-        # Check current revision
-        result = subprocess.run(['alembic', 'current'], capture_output=True, text=True)
-        print("Current database revision:")
-        print(result.stdout)
+        # Run Alembic in-process instead of shelling out three times; this
+        # also avoids parsing revisions out of subprocess stdout
+        cfg = Config('alembic.ini')
+        head_revision = ScriptDirectory.from_config(cfg).get_current_head()
 
-        # Check for pending migrations
-        result = subprocess.run(['alembic', 'heads'], capture_output=True, text=True)
-        latest_revision = result.stdout.strip()
+        with engine.connect() as connection:
+            current_revision = MigrationContext.configure(connection).get_current_revision()
 
-        result = subprocess.run(['alembic', 'current'], capture_output=True, text=True)
-        current_revision = result.stdout.strip().split(' ')[0]
+        print(f"Current database revision: {current_revision}")
 
-        if latest_revision != current_revision:
+        if current_revision != head_revision:
             print("Pending migrations found. Applying migrations...")
-            result = subprocess.run(['alembic', 'upgrade', 'head'], check=True)
+            command.upgrade(cfg, 'head')
             print("Migrations applied successfully.")
         else:
             print("Database is up to date. No migrations to apply.")
 
         return True
-    except subprocess.CalledProcessError as e:
+    except Exception as e:
         print(f"Error occurred while running migrations: {e}")
         return False
 
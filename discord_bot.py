@@ -1,40 +1,31 @@
 import os
-from discord.ext import commands, tasks
-from email_crawler import fetch_articles_from_days
-from discord import Intents
+from discord.ext import commands
+from email_crawler import fetch_articles_from_days, fetch_unread_emails, has_articles_from_days
 from dotenv import load_dotenv
-from config_manager import get_cron_frequency, get_min_relevancy_score, get_search_criteria
+from config_manager import get_cron_frequency, get_min_relevancy_score, get_search_criteria, reload_config
 import logging
+from logging_config import setup_logging
 import functools
 import discord
 from discord import app_commands
 import sys
 import signal
 import asyncio
+import time
+from collections import defaultdict
+from itertools import chain
+from operator import itemgetter
 from flask import Flask, jsonify
 import threading
 
 # Set up logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S',
-    handlers=[
-        logging.FileHandler("newsletter_bot.log"),
-        logging.StreamHandler()
-    ]
-)
+setup_logging()
 
 load_dotenv()  # Load environment variables from .env file
 
 # Load environment variables
 TOKEN = os.getenv('DISCORD_TOKEN')
 
-# Set up the bot
-intents = Intents.default()
-intents.message_content = True
-bot = commands.Bot(command_prefix='?', intents=intents)
-
 # Set up Flask app
 app = Flask(__name__)
 
@@ -59,14 +50,6 @@ def command_error_handler(func):
             await interaction.followup.send("Something went wrong. Please try again later.")
     return wrapper
 
-# Apply the wrapper to all commands
-for command in bot.commands:
-    command.callback = command_error_handler(command.callback)
-
-@bot.event
-async def on_ready():
-    print(f'Logged in as {bot.user}')
-
 class NewsletterBot(commands.Bot):
     def __init__(self):
         intents = discord.Intents.default()
@@ -75,69 +58,162 @@ class NewsletterBot(commands.Bot):
 
     async def setup_hook(self):
         await self.tree.sync()
+        # Kick off the periodic crawl here: setup_hook runs exactly once,
+        # unlike on_ready which re-fires on every gateway reconnect
+        self.crawler_task = asyncio.create_task(crawler_loop())
 
 bot = NewsletterBot()
 
-class ArticlePaginator(discord.ui.View):
-    def __init__(self, articles, days):
-        super().__init__(timeout=300)
-        self.articles = articles
-        self.days = days
-        self.current_page = 0
-        self.per_page = 10
-        self.max_pages = (len(self.articles) - 1) // self.per_page + 1
-
-        # Hide buttons if there's only one page
-        if self.max_pages <= 1:
-            self.previous_button.style = discord.ButtonStyle.gray
-            self.previous_button.disabled = True
-            self.previous_button.label = "\u200b"  # Invisible character
-            self.next_button.style = discord.ButtonStyle.gray
-            self.next_button.disabled = True
-            self.next_button.label = "\u200b"  # Invisible character
-            self.clear_items()  # Remove all items from the view
-
-    @discord.ui.button(label="Previous", style=discord.ButtonStyle.gray, disabled=True)
-    async def previous_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        self.current_page = max(0, self.current_page - 1)
-        await self.update_message(interaction)
-
-    @discord.ui.button(label="Next", style=discord.ButtonStyle.gray)
-    async def next_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        self.current_page = min(self.max_pages - 1, self.current_page + 1)
-        await self.update_message(interaction)
-
-    async def update_message(self, interaction: discord.Interaction):
-        embed = self.create_embed()
-        self.update_button_states()
-        await interaction.response.edit_message(embed=embed, view=self)
-
-    def create_embed(self):
-        start = self.current_page * self.per_page
-        end = start + self.per_page
-        current_articles = self.articles[start:end]
-
-        embed = discord.Embed(title=f"Articles from the last {self.days} days", color=0xFFA500)
-        embed.set_footer(text=f"Page {self.current_page + 1}/{self.max_pages}")
-
-        for i, article in enumerate(current_articles, start=start+1):
-            embed.add_field(
-                name=f"{i}. {article.title}",
-                value=f"{article.url}\n{article.description[:160] + '...' if len(article.description) > 160 else article.description}",
-                inline=False
-            )
-
-        return embed
-
-    def update_button_states(self):
-        if self.max_pages <= 1:
-            return  # Don't update states if there's only one page
-        self.previous_button.disabled = (self.current_page == 0)
-        self.next_button.disabled = (self.current_page == self.max_pages - 1)
-
-def group_criteria(criteria):
-    grouped = get_search_criteria()
-    return {group: [c.lower() for c in criteria if c.lower() in group.lower().split(', ')] for group in grouped}
+@bot.event
+async def on_ready():
+    logging.info(f'Logged in as {bot.user}')
+
+# Guards against overlapping crawl runs
+crawl_running = asyncio.Lock()
+
+async def crawler_loop():
+    """
+    Runs the email crawler on an asyncio-native schedule. The cadence is
+    re-read from config every iteration (so SIGHUP reloads take effect), the
+    sleep accounts for how long the crawl itself took, and a tick is dropped
+    rather than queued if the previous crawl is still running.
+    """
+    loop = asyncio.get_running_loop()
+    while not bot.is_closed():
+        start = loop.time()
+        if crawl_running.locked():
+            logging.warning("Previous crawl still running, skipping this tick")
+        else:
+            async with crawl_running:
+                await asyncio.to_thread(fetch_unread_emails)
+        await asyncio.sleep(max(0, get_cron_frequency() * 60 - (loop.time() - start)))
+
+PER_PAGE = 10
+
+# Short-lived cache of fetched windows so flipping pager pages doesn't re-run
+# the query + sort per click. Size-capped, so bot memory stays bounded no
+# matter how many pagers are open.
+_PAGER_CACHE = {}
+_PAGER_CACHE_TTL = 60  # seconds
+_PAGER_CACHE_MAX = 8
+
+def _pager_cache_put(key, articles):
+    if len(_PAGER_CACHE) >= _PAGER_CACHE_MAX and key not in _PAGER_CACHE:
+        # Evict the stalest entry to keep the cache bounded
+        _PAGER_CACHE.pop(min(_PAGER_CACHE, key=lambda k: _PAGER_CACHE[k][0]))
+    _PAGER_CACHE[key] = (time.monotonic(), articles)
+
+def fetch_sorted_articles_cached(days, all, criteria):
+    key = (days, all, criteria)
+    hit = _PAGER_CACHE.get(key)
+    if hit and time.monotonic() - hit[0] < _PAGER_CACHE_TTL:
+        return hit[1]
+    articles = fetch_sorted_articles(days, all, criteria)
+    _pager_cache_put(key, articles)
+    return articles
+
+def fetch_sorted_articles(days, all, criteria):
+    """
+    Fetches, filters and sorts articles for the /fr command. Blocking (DB
+    round-trip), so callers run it via asyncio.to_thread.
+    """
+    articles = fetch_articles_from_days(days, criteria)
+
+    if all == 0:
+        min_relevancy = get_min_relevancy_score()
+        articles = [
+            a for a in articles
+            if max(a.criteria_scores.values(), default=0) >= min_relevancy
+        ]
+
+    # Sort by relevancy score. If criteria is provided, sort by THAT criteria score only
+    if criteria:
+        articles.sort(key=lambda x: x.criteria_scores.get(criteria, 0), reverse=True)
+    else:
+        # Safely get the highest score from criteria, defaulting to 0 if criteria is empty
+        articles.sort(key=lambda x: x.criteria[0]['score'] if x.criteria else 0, reverse=True)
+
+    return articles
+
+def create_articles_embed(articles, days, page):
+    start = page * PER_PAGE
+    current_articles = articles[start:start + PER_PAGE]
+    max_pages = (len(articles) - 1) // PER_PAGE + 1
+
+    embed = discord.Embed(title=f"Articles from the last {days} days", color=0xFFA500)
+    embed.set_footer(text=f"Page {page + 1}/{max_pages}")
+
+    for i, article in enumerate(current_articles, start=start+1):
+        embed.add_field(
+            name=f"{i}. {article.title}",
+            value=f"{article.url}\n{article.short_description}",
+            inline=False
+        )
+
+    return embed
+
+def create_pager_view(days, all, criteria, page, max_pages):
+    """
+    Builds Previous/Next buttons whose custom_id encodes the full query and
+    current page, so a click can be resolved without any view state held in
+    memory — outstanding pagers keep working across bot restarts.
+    """
+    if max_pages <= 1:
+        return None
+
+    state = f"fr:{days}:{all}:{criteria or ''}:{page}"
+    view = discord.ui.View(timeout=None)
+    view.add_item(discord.ui.Button(label="Previous", style=discord.ButtonStyle.gray,
+                                    custom_id=f"{state}:prev", disabled=(page == 0)))
+    view.add_item(discord.ui.Button(label="Next", style=discord.ButtonStyle.gray,
+                                    custom_id=f"{state}:next", disabled=(page >= max_pages - 1)))
+    return view
+
+@bot.event
+async def on_interaction(interaction: discord.Interaction):
+    # Pager clicks arrive as raw component interactions; rebuild the page from
+    # the custom_id instead of dispatching into a stored View instance
+    if interaction.type != discord.InteractionType.component:
+        return
+
+    custom_id = interaction.data.get('custom_id', '')
+    if not custom_id.startswith('fr:'):
+        return
+
+    try:
+        _, days, all, criteria, page, direction = custom_id.split(':')
+        days, all, page = int(days), int(all), int(page)
+    except ValueError:
+        return
+    criteria = criteria or None
+
+    articles = await asyncio.to_thread(fetch_sorted_articles_cached, days, all, criteria)
+    if not articles:
+        await interaction.response.edit_message(
+            content="No articles found for the specified period.", embed=None, view=None)
+        return
+
+    max_pages = (len(articles) - 1) // PER_PAGE + 1
+    page = page + 1 if direction == 'next' else page - 1
+    page = max(0, min(page, max_pages - 1))
+
+    embed = create_articles_embed(articles, days, page)
+    view = create_pager_view(days, all, criteria, page, max_pages)
+    await interaction.response.edit_message(embed=embed, view=view)
+
+@functools.lru_cache(maxsize=1)
+def valid_criteria_list():
+    # Individual criteria, lowercased, in config order
+    return tuple(c.lower() for group in get_search_criteria() for c in group.split(', '))
+
+@functools.lru_cache(maxsize=1)
+def valid_criteria_set():
+    # Frozen set of the same criteria for O(1) validation per command
+    return frozenset(valid_criteria_list())
+
+@functools.lru_cache(maxsize=1)
+def grouped_criteria_lower():
+    return {group: [c.lower() for c in group.split(', ')] for group in get_search_criteria()}
 
 @bot.tree.command(name="fr", description="Fetch recent articles")
 @app_commands.describe(
@@ -157,36 +233,32 @@ async def fr(interaction: discord.Interaction, days: int = 7, all: int = 0, crit
         await interaction.followup.send("The 'all' parameter must be either 0 or 1.")
         return
 
-    valid_criteria = [c.lower() for group in get_search_criteria() for c in group.split(', ')]
     if criteria:
         criteria = criteria.lower()
-        if criteria not in valid_criteria:
-            grouped_criteria = group_criteria(valid_criteria)
-            criteria_list = "\n".join([f"{', '.join(items)}" for group, items in grouped_criteria.items() if items])
+        if criteria not in valid_criteria_set():
+            criteria_list = "\n".join(f"{', '.join(items)}" for items in grouped_criteria_lower().values() if items)
             await interaction.followup.send(f"Invalid criteria. Please choose from:\n{criteria_list}")
             return
 
-    articles = fetch_articles_from_days(days, criteria)
-
-    min_relevancy = get_min_relevancy_score()
+    # Probe for emptiness first: one indexed LIMIT 1 query instead of
+    # shipping and parsing the whole window when there is nothing to show
+    if not await asyncio.to_thread(has_articles_from_days, days):
+        await interaction.followup.send("No articles found for the specified period.")
+        return
 
-    if all == 0:
-        articles = [
-            a for a in articles 
-            if any(criterion['score'] >= min_relevancy for criterion in a.criteria)
-        ]
+    # Run the blocking DB fetch off the event loop so the gateway
+    # heartbeat and other interactions stay responsive
+    articles = await asyncio.to_thread(fetch_sorted_articles, days, all, criteria)
+    _pager_cache_put((days, all, criteria), articles)
 
     if articles:
-        # Sort by relevancy score. If criteria is provided, sort by THAT criteria score only
-        if criteria:
-            articles.sort(key=lambda x: next((criterion['score'] for criterion in x.criteria if criterion['name'].lower() == criteria), 0), reverse=True)
+        max_pages = (len(articles) - 1) // PER_PAGE + 1
+        embed = create_articles_embed(articles, days, 0)
+        view = create_pager_view(days, all, criteria, 0, max_pages)
+        if view:
+            await interaction.followup.send(embed=embed, view=view)
         else:
-            # Safely get the highest score from criteria, defaulting to 0 if criteria is empty
-            articles.sort(key=lambda x: x.criteria[0]['score'] if x.criteria else 0, reverse=True)
-
-        paginator = ArticlePaginator(articles, days)
-        embed = paginator.create_embed()
-        await interaction.followup.send(embed=embed, view=paginator)
+            await interaction.followup.send(embed=embed)
     else:
         await interaction.followup.send("No articles found for the specified period.")
 
@@ -203,41 +275,51 @@ async def memo_drafts(interaction: discord.Interaction, days: int = 7, criteria:
         await interaction.followup.send("Please provide a valid number of days (greater than 0).")
         return
 
-    valid_criteria = [c.lower() for group in get_search_criteria() for c in group.split(', ')]
     if criteria:
         criteria = criteria.lower()
-        if criteria not in valid_criteria:
-            grouped_criteria = group_criteria(valid_criteria)
-            criteria_list = "\n".join([f"{', '.join(items)}" for group, items in grouped_criteria.items() if items])
+        if criteria not in valid_criteria_set():
+            criteria_list = "\n".join(f"{', '.join(items)}" for items in grouped_criteria_lower().values() if items)
             await interaction.followup.send(f"Invalid criteria. Please choose from:\n{criteria_list}")
             return
 
-    articles = fetch_articles_from_days(days, criteria)
+    # Probe for emptiness before materializing the full window
+    if not await asyncio.to_thread(has_articles_from_days, days):
+        await interaction.followup.send("No relevant articles found for the specified period.")
+        return
+
+    # Run the blocking DB fetch off the event loop so the gateway
+    # heartbeat and other interactions stay responsive
+    articles = await asyncio.to_thread(fetch_articles_from_days, days, criteria)
 
     min_relevancy = get_min_relevancy_score()
 
     # Filter articles by minimum relevancy score
     articles = [
-        a for a in articles 
-        if any(criterion['score'] >= min_relevancy for criterion in a.criteria)
+        a for a in articles
+        if max(a.criteria_scores.values(), default=0) >= min_relevancy
     ]
 
     if not articles:
         await interaction.followup.send("No relevant articles found for the specified period.")
         return
 
+    # Group articles by criterion once, then draw each memo from its bucket
+    # instead of rescanning the whole list per criteria
+    buckets = build_criteria_buckets(articles, min_relevancy)
+
     # Generate memo drafts
     used_articles = set()
     if criteria:
-        memo_draft, used_articles = generate_memo_draft(articles, criteria, used_articles=used_articles)
+        memo_draft, used_articles = generate_memo_draft(buckets, criteria, used_articles=used_articles)
         memo_drafts = [memo_draft]
     else:
+        valid_criteria = valid_criteria_list()
         top_criteria = valid_criteria[:3]
         memo_drafts = []
         for c in top_criteria:
-            memo_draft, used_articles = generate_memo_draft(articles, c, used_articles=used_articles)
+            memo_draft, used_articles = generate_memo_draft(buckets, c, used_articles=used_articles)
             memo_drafts.append(memo_draft)
-        other_memo_draft, used_articles = generate_memo_draft(articles, "Other", valid_criteria[3:], used_articles=used_articles)
+        other_memo_draft, used_articles = generate_memo_draft(buckets, "Other", valid_criteria[3:], used_articles=used_articles)
         memo_drafts.append(other_memo_draft)
 
     # Create and send embeds
@@ -248,31 +330,39 @@ async def memo_drafts(interaction: discord.Interaction, days: int = 7, criteria:
     else:
         await interaction.followup.send("No memo drafts could be generated for the specified criteria and period.")
 
-def generate_memo_draft(articles, criteria, other_criteria=None, used_articles=None):
+def build_criteria_buckets(articles, min_relevancy):
+    # Single pass over the articles: bucket (score, article) pairs under each
+    # matching criterion name, then sort each bucket by score descending
+    buckets = defaultdict(list)
+    for article in articles:
+        for name, score in article.criteria_scores.items():
+            if score >= min_relevancy:
+                buckets[name].append((score, article))
+    for bucket in buckets.values():
+        bucket.sort(key=itemgetter(0), reverse=True)
+    return buckets
+
+def generate_memo_draft(buckets, criteria, other_criteria=None, used_articles=None):
     if used_articles is None:
         used_articles = set()
 
     if other_criteria:
-        filtered_articles = [
-            a for a in articles 
-            if any(criterion['name'].lower() in [c.lower() for c in other_criteria] for criterion in a.criteria)
-            and a.url not in used_articles
-        ]
+        # Merge the remaining buckets, keeping the overall score order
+        candidates = sorted(
+            chain.from_iterable(buckets.get(c.lower(), []) for c in other_criteria),
+            key=itemgetter(0), reverse=True
+        )
     else:
-        filtered_articles = [
-            a for a in articles 
-            if any(criterion['name'].lower() == criteria.lower() for criterion in a.criteria)
-            and a.url not in used_articles
-        ]
-    
-    # Sort articles by relevancy score for the specific criteria
-    filtered_articles.sort(
-        key=lambda x: next((criterion['score'] for criterion in x.criteria if criterion['name'].lower() == criteria.lower()), 0),
-        reverse=True
-    )
+        candidates = buckets.get(criteria.lower(), [])
 
-    selected_articles = filtered_articles[:8]  # Top 8 articles
-    used_articles.update(article.url for article in selected_articles)
+    selected_articles = []
+    for _, article in candidates:
+        if article.url in used_articles:
+            continue
+        used_articles.add(article.url)
+        selected_articles.append(article)
+        if len(selected_articles) == 8:  # Top 8 articles
+            break
 
     memo = {
         'criteria': criteria,
@@ -305,7 +395,7 @@ def create_memo_embed(memo):
     return embed
 
 async def exit_handler(signum, frame):
-    print("Received signal to exit. Shutting down...")
+    logging.info("Received signal to exit. Shutting down...")
     await bot.close()
     for task in asyncio.all_tasks(loop=bot.loop):
         if task is not asyncio.current_task():
@@ -316,15 +406,25 @@ async def exit_handler(signum, frame):
 def signal_handler(signum, frame):
     bot.loop.create_task(exit_handler(signum, frame))
 
+def reload_handler(signum, frame):
+    # SIGHUP drops the cached config so edits to config.yaml take effect
+    # without a restart
+    reload_config()
+    valid_criteria_list.cache_clear()
+    valid_criteria_set.cache_clear()
+    grouped_criteria_lower.cache_clear()
+    logging.info("Configuration reloaded")
+
 # Register the exit handler
 signal.signal(signal.SIGINT, signal_handler)
 signal.signal(signal.SIGTERM, signal_handler)
+signal.signal(signal.SIGHUP, reload_handler)
 
 def run_bot():
     try:
         bot.run(TOKEN)
     except Exception as e:
-        print(f"Unhandled exception: {e}")
+        logging.error(f"Unhandled exception: {e}")
         sys.exit(1)
     finally:
         if not bot.is_closed():
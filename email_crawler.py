@@ -8,91 +8,183 @@ from imap_tools import MailBox, AND, OR, MailMessageFlags
 from datetime import datetime, timedelta
 from config_manager import get_allowed_senders
 import logging
+from logging_config import setup_logging
 import socket
 from email_parser import extract_articles, parse_date
 from dotenv import load_dotenv
-from database import get_db, save_article, get_articles
+from database import SessionLocal, get_db, save_articles, get_articles, has_articles
 from sqlalchemy.orm import Session
 import ast
+import orjson
+import re
 from typing import List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 
 # Set up logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S',
-    handlers=[
-        logging.FileHandler("newsletter_bot.log"),
-        logging.StreamHandler()
-    ]
-)
+setup_logging()
 
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
-def fetch_unread_emails():
+# Strips the query string and fragment from article URLs in one C-level scan;
+# fragment-only variants previously slipped past the duplicate check
+_URL_TAIL = re.compile(r'[?#].*$')
+
+# How many emails are extracted/saved concurrently per crawl run
+MAX_CONCURRENT_EMAILS = 4
+
+# Long-lived IMAP connection, reused across crawl runs so each run doesn't
+# pay a fresh TLS handshake + LOGIN + SELECT. Reconnected lazily on error.
+_mailbox = None
+
+def get_mailbox():
     """
-    Connects to the IMAP server, fetches unread emails from allowed senders,
-    processes them, and saves the processed content to the PostgreSQL database.
+    Returns a logged-in MailBox, reusing the existing connection when it is
+    still alive and reconnecting transparently when it is not.
     """
-    email = os.getenv('EMAIL_ADDRESS')
-    password = os.getenv('EMAIL_PASSWORD')
-    imap_server = os.getenv('IMAP_SERVER')
-    allowed_senders = get_allowed_senders()
+    global _mailbox
+    if _mailbox is not None:
+        try:
+            _mailbox.client.noop()
+            return _mailbox
+        except Exception:
+            logger.info("IMAP connection stale, reconnecting")
+            close_mailbox()
 
+    imap_server = os.getenv('IMAP_SERVER')
     logger.info(f"Connecting to IMAP server: {imap_server}")
+    _mailbox = MailBox(imap_server, port=993).login(
+        os.getenv('EMAIL_ADDRESS'), os.getenv('EMAIL_PASSWORD'))
+    return _mailbox
+
+def close_mailbox():
+    """
+    Drops the cached IMAP connection; the next get_mailbox() call reconnects.
+    """
+    global _mailbox
+    if _mailbox is not None:
+        try:
+            _mailbox.logout()
+        except Exception:
+            pass
+        _mailbox = None
+
+@lru_cache(maxsize=1)
+def _sender_filter(senders):
+    # The OR chain over allowed senders is static between config reloads;
+    # keying the cache on the tuple means it rebuilds only when they change
+    return OR(*[f'FROM "{sender}"' for sender in senders])
+
+def fetch_unread_emails():
+    """
+    Fetches unread emails from allowed senders over the shared IMAP connection,
+    processes them, and saves the processed content to the PostgreSQL database.
+    """
     logger.info("Fetching unread emails")
 
     try:
-        with MailBox(imap_server, port=993).login(email, password) as mailbox:
-            sender_filter = OR(*[f'FROM "{sender}"' for sender in allowed_senders])
-            unread_filter = 'UNSEEN'
-            
-            logger.info("Applying filters and fetching emails")
-            emails = list(mailbox.fetch(AND(sender_filter, unread_filter)))
-            logger.info(f"Fetched {len(emails)} unread emails")
-
-            # Sort emails by date (older to newer)
-            emails.sort(key=lambda x: parse_date(x.date_str))
-
-            for email in emails:
-                try:
-                    process_and_save_email(email)
-                    # Mark email as read if processing was successful
-                    mailbox.flag(email.uid, MailMessageFlags.SEEN, True)
-                except Exception as e:
-                    logger.error(f"Failed to process email {email.subject}: {str(e)}")
-                    # Ensure the email remains unread for the next fetch
-                    mailbox.flag(email.uid, MailMessageFlags.SEEN, False)
+        mailbox = get_mailbox()
+        sender_filter = _sender_filter(tuple(get_allowed_senders()))
+        unread_filter = 'UNSEEN'
+
+        logger.info("Applying filters and fetching emails")
+        # Pipeline the stages: messages stream out of the chunked FETCH
+        # (bulk=100, so memory stays bounded on large backlogs) and are
+        # submitted to the worker pool as they arrive, overlapping the
+        # remaining IMAP transfer with extraction and DB writes. Each date is
+        # parsed once here and passed through to process_and_save_email.
+        # Flagging stays on this thread because the single IMAP connection is
+        # not safe to share across workers; mark_seen=False because we only
+        # flag SEEN after an email is processed successfully.
+        dated_emails = []
+        futures = []
+        with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_EMAILS) as executor:
+            for email in mailbox.fetch(AND(sender_filter, unread_filter), bulk=100, mark_seen=False):
+                dated = (parse_date(email.date_str), email)
+                dated_emails.append(dated)
+                futures.append(executor.submit(_process_email_safe, dated))
+            errors = [future.result() for future in futures]
+        logger.info(f"Fetched {len(dated_emails)} unread emails")
+
+        success_uids, failure_uids = [], []
+        for (_, email), error in zip(dated_emails, errors):
+            if error is None:
+                success_uids.append(email.uid)
+            else:
+                logger.error(f"Failed to process email {email.subject}: {str(error)}")
+                failure_uids.append(email.uid)
+
+        # Coalesce the flag updates into one UID STORE per outcome instead of
+        # a round-trip per message
+        if success_uids:
+            # Mark emails as read if processing was successful
+            mailbox.flag(success_uids, MailMessageFlags.SEEN, True)
+        if failure_uids:
+            # Ensure failed emails remain unread for the next fetch
+            mailbox.flag(failure_uids, MailMessageFlags.SEEN, False)
 
     except socket.error as e:
         logger.error(f"Socket error: {str(e)}")
+        close_mailbox()
     except Exception as e:
         logger.error(f"Error connecting to email server: {str(e)}")
+        close_mailbox()
 
-def process_and_save_email(email):
+def _process_email_safe(dated_email):
     """
-    Processes a single email, extracts articles, and saves them to the PostgreSQL database.
+    Runs process_and_save_email with its own session (sessions are not
+    thread-safe, so each worker gets one) and returns the exception (or None
+    on success), so worker threads never raise into the executor.
+    """
+    email_time, email = dated_email
+    db = SessionLocal()
+    try:
+        process_and_save_email(email, email_time, db)
+        return None
+    except Exception as e:
+        return e
+    finally:
+        db.close()
+
+def process_and_save_email(email, email_time, db):
+    """
+    Processes a single email, extracts articles, and saves them to the PostgreSQL
+    database using the session and pre-parsed date provided by the caller.
     """
     # Extract articles from email
     articles = extract_articles(email)
 
-    # Save articles to database
-    db = next(get_db())
-    for article in articles:
-        save_article(
-            db,
+    # Save all of the email's articles in one INSERT + commit instead of a
+    # round-trip per article
+    rows = [
+        dict(
             email_uid=email.uid,
-            email_time=parse_date(email.date_str),
+            email_time=email_time,
             title=article['title'],
             description=article['description'],
-            url=article['url'].split('?')[0],
+            url=_URL_TAIL.sub('', article['url']),
             criteria=article['criteria']
         )
-    
+        for article in articles
+    ]
+    save_articles(db, rows)
+
     logger.info(f"Processed and saved email: {email.subject}")
 
+def has_articles_from_days(days: int) -> bool:
+    """
+    Cheap existence check for the last 'days' days, used before paying for a
+    full fetch + criteria parse when the window may well be empty.
+    """
+    cutoff_date = datetime.now() - timedelta(days=days)
+    db = SessionLocal()
+    try:
+        return has_articles(db, date_from=cutoff_date)
+    finally:
+        db.close()
+
 def fetch_articles_from_days(days: int, criteria: Optional[str] = None) -> List[dict]:
     """
     Fetch articles from the last 'days' days from the PostgreSQL database.
@@ -109,19 +201,30 @@ def fetch_articles_from_days(days: int, criteria: Optional[str] = None) -> List[
     for article in articles:
         if isinstance(article.criteria, str):
             try:
-                article.criteria = ast.literal_eval(article.criteria)
-            except (ValueError, SyntaxError):
-                article.criteria = []  # Set to empty list if parsing fails
+                article.criteria = orjson.loads(article.criteria)
+            except orjson.JSONDecodeError:
+                # Legacy rows were serialized with str() (Python repr), which
+                # only ast.literal_eval can read back
+                try:
+                    article.criteria = ast.literal_eval(article.criteria)
+                except (ValueError, SyntaxError):
+                    article.criteria = []  # Set to empty list if parsing fails
+        # Precompute a lowercase name -> score lookup so sorting and filtering
+        # downstream are dict lookups instead of per-comparison scans
+        article.criteria_scores = {c['name'].lower(): c['score'] for c in article.criteria}
+        # Truncate the description once here rather than on every page render
+        article.short_description = (
+            article.description if len(article.description) <= 160
+            else article.description[:160] + '...'
+        )
 
     # Filter by criteria if provided
     if criteria:
-        criteria_list = [c.strip().lower() for c in criteria.split(',')]
-        filtered_articles = []
-        for article in articles:
-            article_criteria = [c['name'].lower() for c in article.criteria]
-            if any(c in article_criteria for c in criteria_list):
-                filtered_articles.append(article)
-        articles = filtered_articles
+        criteria_set = frozenset(c.strip().lower() for c in criteria.split(','))
+        articles = [
+            article for article in articles
+            if not criteria_set.isdisjoint(article.criteria_scores)
+        ]
 
     return articles
 
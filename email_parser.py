@@ -2,9 +2,9 @@ import logging
 import google.generativeai as genai
 import os
 import json
-import re
 from config_manager import get_search_criteria, get_min_relevancy_score
 from datetime import datetime
+from functools import lru_cache
 from email.utils import parsedate_to_datetime
 
 logger = logging.getLogger(__name__)
@@ -13,17 +13,30 @@ logger = logging.getLogger(__name__)
 genai.configure(api_key=os.getenv('GEMINI_API_KEY'))
 model = genai.GenerativeModel('gemini-1.5-pro')
 
-def extract_articles(email):
+_JSON_DECODER = json.JSONDecoder()
+
+def _extract_json_array(text):
     """
-    Extracts individual articles from an email using Gemini 1.5 Pro.
-    Returns a list of dictionaries, each containing article title, description, and URL.
+    Finds and parses the first valid JSON array in text, ignoring any prose
+    the model wraps around it. Raises ValueError when no array parses.
     """
-    logger.info(f"Extracting articles from email: {email.subject}")
-    
-    # Get grouped criteria
-    grouped_criteria = get_search_criteria()
-    
-    prompt = f"""
+    idx = text.find('[')
+    while idx != -1:
+        try:
+            value, _ = _JSON_DECODER.raw_decode(text, idx)
+            if isinstance(value, list):
+                return value
+        except json.JSONDecodeError:
+            pass
+        idx = text.find('[', idx + 1)
+    raise ValueError("No JSON array found in the response")
+
+@lru_cache(maxsize=1)
+def _prompt_parts(min_relevancy_score, grouped_criteria):
+    # The prompt is several KB of static instructions; build everything
+    # except the email body once per config state instead of per email.
+    # Returned as the (head, tail) surrounding the email content slot.
+    head = f"""
     Analyze the following email content and extract information about articles mentioned.
     For each article:
     1. Extract the original title, description (if available), and URL (look for [LINK: url] in the text)
@@ -38,10 +51,11 @@ def extract_articles(email):
       b. Prioritize articles that are news, research papers, or have a significant and unique contribution to the field
       c. Save 0.9 and above for the most relevant articles, following the above guidelines
       d. Use up to 2 decimal places for the relevancy scores
-    6. Only include criteria with relevancy scores above {get_min_relevancy_score()}
+    6. Only include criteria with relevancy scores above {min_relevancy_score}
 
     Email content:
-    {email.text or email.html}
+    """
+    tail = f"""
 
     Format the output as a JSON array of objects, each with 'title', 'description', 'url', and 'criteria' keys.
     The 'title' and 'description' should contain the rewritten versions.
@@ -65,19 +79,27 @@ def extract_articles(email):
         {{"name": "React", "score": 0.80}}
     ]
     """
-    
+    return head, tail
+
+def extract_articles(email):
+    """
+    Extracts individual articles from an email using Gemini 1.5 Pro.
+    Returns a list of dictionaries, each containing article title, description, and URL.
+    """
+    logger.info(f"Extracting articles from email: {email.subject}")
+
+    # Keying on the (cached) config values keeps the template fresh across
+    # config reloads; str() makes the criteria list hashable
+    head, tail = _prompt_parts(get_min_relevancy_score(), str(get_search_criteria()))
+    prompt = head + (email.text or email.html) + tail
+
     logger.info("Requesting Gemini to extract articles from email")
 
     response = model.generate_content(prompt)
     
     try:
-        json_match = re.search(r'\[.*\]', response.text, re.DOTALL)
-        if json_match:
-            json_str = json_match.group(0)
-            articles = json.loads(json_str)
-        else:
-            raise ValueError("No JSON array found in the response")
-        
+        articles = _extract_json_array(response.text)
+
         for article in articles:
             if not all(key in article for key in ('title', 'description', 'url')):
                 raise ValueError(f"Invalid article structure: {article}")
@@ -96,19 +118,16 @@ def extract_articles(email):
     return articles
 
 def parse_date(date_str):
+    # parsedate_to_datetime already covers every RFC 2822 shape (with or
+    # without weekday/timezone), so the only fallback worth keeping is the
+    # ISO-like form, parsed with the C-level fromisoformat rather than
+    # strptime's interpreted format machinery
     try:
         return parsedate_to_datetime(date_str)
     except (ValueError, TypeError):
-        formats = [
-            '%a, %d %b %Y %H:%M:%S %z',  # RFC 2822 format
-            '%Y-%m-%d %H:%M:%S',
-            '%d %b %Y %H:%M:%S %z',
-            '%a, %d %b %Y %H:%M:%S',
-        ]
-        for fmt in formats:
-            try:
-                return datetime.strptime(date_str, fmt)
-            except ValueError:
-                continue
-    
+        try:
+            return datetime.fromisoformat(date_str)
+        except (ValueError, TypeError):
+            pass
+
     raise ValueError(f"Unable to parse date string: {date_str}")
@@ -0,0 +1,39 @@
+"""
+Central logging configuration for the bot and the crawler.
+Both entry points call setup_logging(); repeat calls are no-ops, so importing
+modules never stack duplicate handlers (which used to double-write every line
+to newsletter_bot.log).
+"""
+
+import atexit
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+def setup_logging():
+    root = logging.getLogger()
+    if root.handlers:
+        return
+
+    formatter = logging.Formatter(
+        '%(asctime)s - %(levelname)s - %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
+
+    # Rotate the log so disk usage stays bounded
+    file_handler = RotatingFileHandler("newsletter_bot.log", maxBytes=5_000_000, backupCount=3)
+    file_handler.setFormatter(formatter)
+
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(formatter)
+
+    # Callers only enqueue records; the listener thread does the actual file
+    # and console writes, so logging never blocks a hot path (or the event
+    # loop) on disk I/O
+    log_queue = queue.SimpleQueue()
+    root.setLevel(logging.INFO)
+    root.addHandler(QueueHandler(log_queue))
+
+    listener = QueueListener(log_queue, file_handler, stream_handler)
+    listener.start()
+    atexit.register(listener.stop)